@@ -44,6 +44,9 @@ setup(
             "black>=23.0",
             "flake8>=6.0",
         ],
+        "fast": [
+            "orjson>=3.6.0",
+        ],
     },
     entry_points={
         "console_scripts": [
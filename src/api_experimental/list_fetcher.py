@@ -15,6 +15,7 @@ script_dir = Path(__file__).parent
 output_dir = script_dir / "output"
 output_dir.mkdir(exist_ok=True)
 output_file: Path = output_dir / f"output-{current_date}.csv"
+FIELDNAMES = ('username', 'price', 'subscription_status', 'lists')
 
 
 class ListFetcher:
@@ -86,43 +87,39 @@ class ListFetcher:
         Args:
             users: List of user objects from API
         """
-        # Clear output file if starting fresh
-        with open(output_file, 'w', newline='') as csvfile:
-            fieldnames = ['username', 'price', 'subscription_status', 'lists']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        # One buffered handle for the whole run rather than reopening per row
+        with open(output_file, 'w', newline='', buffering=65536) as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
             writer.writeheader()
 
-        # Process each user
-        for i, user in enumerate(users, 1):
-            username = user.get('username')
+            # Process each user
+            for i, user in enumerate(users, 1):
+                username = user.get('username')
 
-            if not username or username in self.seen_users:
-                continue
+                if not username or username in self.seen_users:
+                    continue
 
-            self.seen_users.add(username)
+                self.seen_users.add(username)
 
-            try:
-                # Get full profile data with pricing
-                logger.debug(f"Fetching profile for {username} ({i}/{len(users)})")
-                profile = self.api_client.get_user_profile(username)
+                try:
+                    # Get full profile data with pricing
+                    logger.debug(f"Fetching profile for {username} ({i}/{len(users)})")
+                    profile = self.api_client.get_user_profile(username)
 
-                # Extract data
-                user_data = self._extract_user_data(profile)
+                    # Extract data
+                    user_data = self._extract_user_data(profile)
 
-                # Write to CSV
-                with open(output_file, 'a', newline='') as csvfile:
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                    # Write to CSV
                     writer.writerow(user_data)
-                    csvfile.flush()
 
-                logger.info(f"Scraped {username} ({i}/{len(users)})")
+                    logger.info(f"Scraped {username} ({i}/{len(users)})")
 
-                # Rate limiting
-                time.sleep(0.3)
+                    # Rate limiting
+                    time.sleep(0.3)
 
-            except Exception as e:
-                logger.warning(f"Failed to fetch profile for {username}: {e}")
-                continue
+                except Exception as e:
+                    logger.warning(f"Failed to fetch profile for {username}: {e}")
+                    continue
 
     def _extract_user_data(self, profile: Dict) -> Dict[str, str]:
         """
@@ -200,10 +197,8 @@ class ListFetcher:
         Args:
             users: List of user objects from subscriptions API
         """
-        fieldnames = ['username', 'price', 'subscription_status', 'lists']
-
-        with open(output_file, 'w', newline='') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        with open(output_file, 'w', newline='', buffering=65536) as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
             writer.writeheader()
 
             for user in users:
@@ -218,7 +213,6 @@ class ListFetcher:
                 user_data = self._extract_user_data(user)
 
                 writer.writerow(user_data)
-                csvfile.flush()
 
                 logger.info(f"Added {username}")
 
@@ -1,13 +1,15 @@
 """Command-line interface for OnlyFans Deals Finder."""
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Optional
 import os
 
 import click
 
-import list_scraper
 from db_analyser import DatabaseAnalyser
 from database import Database
 
@@ -28,14 +30,39 @@ def get_default_user_data_dir() -> str:
         return os.path.expanduser("~/.config/onlyfans-deals-finder")
 
 
+# Background writer for log records, started once by setup_logging
+_log_listener: Optional[QueueListener] = None
+
+
+def _resolve_db(db_path: Optional[str]) -> Optional[Path]:
+    """Convert an optional --db-path value to a Path (None selects the default database)."""
+    return Path(db_path) if db_path else None
+
+
 def setup_logging(verbose: bool):
-    """Configure logging based on verbosity level."""
+    """Configure logging based on verbosity level.
+
+    Records are queued and written to stderr by a background listener, so
+    logging from the scrape loop never waits on the console.
+    """
+    global _log_listener
     level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(
-        format='%(asctime)s %(levelname)-8s %(message)s',
-        level=level,
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _log_listener is not None:
+        return
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(
+        '%(asctime)s %(levelname)-8s %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    ))
+    log_queue = queue.Queue(-1)
+    root.addHandler(QueueHandler(log_queue))
+    _log_listener = QueueListener(log_queue, handler)
+    _log_listener.start()
+    # Flush queued records on exit, including sys.exit() from a command
+    atexit.register(_log_listener.stop)
 
 
 @click.group()
@@ -82,8 +109,11 @@ def scrape(ctx: click.Context, list_id: Optional[str], output: Optional[str], an
 
     logger.info(f"Scraping list ID: {list_id or 'default'}")
 
+    # Imported here so the other commands don't pay for loading Selenium
+    import list_scraper
+
     scraper = list_scraper.OnlyFansScraper(
-        db_path=Path(output) if output else None
+        db_path=_resolve_db(output)
     )
 
     try:
@@ -128,8 +158,7 @@ def stats(ctx: click.Context, db_path: Optional[str]) -> None:
     logger = logging.getLogger(__name__)
 
     try:
-        db_path_obj = Path(db_path) if db_path else None
-        analyser = DatabaseAnalyser(db_path_obj)
+        analyser = DatabaseAnalyser(_resolve_db(db_path))
         analyser.show_stats()
         analyser.close()
     except FileNotFoundError as e:
@@ -153,8 +182,7 @@ def history(ctx: click.Context, db_path: Optional[str], days: int) -> None:
         sys.exit(1)
 
     try:
-        db_path_obj = Path(db_path) if db_path else None
-        analyser = DatabaseAnalyser(db_path_obj)
+        analyser = DatabaseAnalyser(_resolve_db(db_path))
         analyser.find_price_changes_recently(days)
         analyser.close()
     except FileNotFoundError as e:
@@ -173,8 +201,7 @@ def deals(ctx: click.Context, db_path: Optional[str]) -> None:
     logger = logging.getLogger(__name__)
 
     try:
-        db_path_obj = Path(db_path) if db_path else None
-        analyser = DatabaseAnalyser(db_path_obj)
+        analyser = DatabaseAnalyser(_resolve_db(db_path))
         analyser.find_historical_lows()
         analyser.close()
     except FileNotFoundError as e:
@@ -198,8 +225,7 @@ def user(ctx: click.Context, username: str, db_path: Optional[str]) -> None:
         sys.exit(1)
 
     try:
-        db_path_obj = Path(db_path) if db_path else None
-        analyser = DatabaseAnalyser(db_path_obj)
+        analyser = DatabaseAnalyser(_resolve_db(db_path))
         analyser.get_user_history(username)
         analyser.close()
     except FileNotFoundError as e:
@@ -221,8 +247,7 @@ def new_deals(ctx: click.Context, db_path: Optional[str]) -> None:
     logger = logging.getLogger(__name__)
 
     try:
-        db_path_obj = Path(db_path) if db_path else None
-        analyser = DatabaseAnalyser(db_path_obj)
+        analyser = DatabaseAnalyser(_resolve_db(db_path))
         analyser.find_recent_price_drops()
         analyser.close()
     except FileNotFoundError as e:
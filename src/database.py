@@ -1,45 +1,187 @@
 """SQLite database management for OnlyFans user data."""
 import sqlite3
 import logging
+import threading
 from pathlib import Path
-from datetime import datetime
-from typing import Optional, List, Dict, Tuple
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Tuple, Iterator
 from contextlib import contextmanager
+from itertools import chain, groupby
+from operator import itemgetter
 
 logger = logging.getLogger(__name__)
 
+# Project root is one level up from src
+_DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "scraper.db"
+
+# Hot-path statements, shared so every call hands sqlite3 the same SQL text
+# and hits the connection's prepared-statement cache
+
+# Single-pass upsert; first_seen is only written when the row is new
+_SQL_UPSERT_USER = """
+    INSERT INTO users (username, current_price, subscription_status,
+                       first_seen, last_seen, last_scraped_run_id)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(username) DO UPDATE SET
+        current_price = excluded.current_price,
+        subscription_status = excluded.subscription_status,
+        last_seen = excluded.last_seen,
+        last_scraped_run_id = excluded.last_scraped_run_id
+"""
+
+_SQL_INSERT_PRICE_HISTORY = """
+    INSERT INTO price_history (username, price, subscription_status,
+                               scraped_at, scrape_run_id)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+# upsert_users stages each batch in temp.staged_users (created per connection in
+# _connect) and writes users and price_history from it with set-based statements
+_SQL_STAGE_USER = "INSERT INTO temp.staged_users (username, price, subscription_status) VALUES "
+
+# WHERE true lets the parser tell the ON CONFLICT clause apart from a join
+_SQL_UPSERT_STAGED_USERS = """
+    INSERT INTO users (username, current_price, subscription_status,
+                       first_seen, last_seen, last_scraped_run_id)
+    SELECT username, price, subscription_status, ?, ?, ?
+    FROM temp.staged_users WHERE true
+    ON CONFLICT(username) DO UPDATE SET
+        current_price = excluded.current_price,
+        subscription_status = excluded.subscription_status,
+        last_seen = excluded.last_seen,
+        last_scraped_run_id = excluded.last_scraped_run_id
+"""
+
+_SQL_INSERT_STAGED_PRICE_HISTORY = """
+    INSERT INTO price_history (username, price, subscription_status,
+                               scraped_at, scrape_run_id)
+    SELECT username, price, subscription_status, ?, ?
+    FROM temp.staged_users
+"""
+
+# List memberships for a batch are staged in temp.staged_user_lists (created per
+# connection in _connect) and reconciled against user_lists with set operations
+_SQL_STAGE_USER_LIST = "INSERT INTO temp.staged_user_lists (username, list_name) VALUES "
+
+# Staging rows are sent as multi-row VALUES statements, chunked to stay under
+# SQLite's historical default SQLITE_MAX_VARIABLE_NUMBER
+_MAX_SQL_VARIABLES = 999
+
+_SQL_DELETE_STALE_USER_LISTS = """
+    DELETE FROM user_lists
+    WHERE username IN (SELECT username FROM temp.staged_user_lists)
+      AND NOT EXISTS (
+          SELECT 1 FROM temp.staged_user_lists s
+          WHERE s.username = user_lists.username AND s.list_name = user_lists.list_name
+      )
+"""
+
+_SQL_INSERT_NEW_USER_LISTS = """
+    INSERT INTO user_lists (username, list_name)
+    SELECT DISTINCT s.username, s.list_name
+    FROM temp.staged_user_lists s
+    WHERE s.list_name IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM user_lists ul
+          WHERE ul.username = s.username AND ul.list_name = s.list_name
+      )
+"""
+
+# Room in the per-connection prepared-statement cache (sqlite3 default: 128) for
+# every SQL text this class issues, so none is evicted and re-parsed
+_STATEMENT_CACHE_SIZE = 256
+
+# Stored in PRAGMA user_version once the schema DDL has run, so later opens skip
+# it. Bump when _create_schema changes to re-run it on existing databases.
+_SCHEMA_VERSION = 2
+
 
 class Database:
     """Manages SQLite database for OnlyFans scraper data."""
 
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(self, db_path: Optional[Path] = None, durable: bool = False):
         """Initialize database connection.
 
         Args:
             db_path: Path to SQLite database file. Defaults to data/scraper.db
+            durable: Use synchronous=FULL so every commit survives power loss
         """
         if db_path is None:
-            # Get project root (one level up from src)
-            project_root = Path(__file__).parent.parent
-            data_dir = project_root / "data"
-            data_dir.mkdir(exist_ok=True)
-            db_path = data_dir / "scraper.db"
+            db_path = _DEFAULT_DB_PATH
+            db_path.parent.mkdir(exist_ok=True)
 
         self.db_path = db_path
+        self.durable = durable
         self.conn = None
+        # The connection may be shared across threads; explicit transactions,
+        # read or write, take turns since they share one transaction state
+        self._conn_lock = threading.Lock()
         self._connect()
         self._init_schema()
 
     def _connect(self):
         """Establish database connection."""
-        self.conn = sqlite3.connect(self.db_path)
+        # Autocommit mode: transactions are opened explicitly by transaction() and
+        # read_transaction() rather than implicitly before each DML statement
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                                    cached_statements=_STATEMENT_CACHE_SIZE)
         self.conn.row_factory = sqlite3.Row  # Enable column access by name
+        # WAL lets readers run alongside the writer and, with synchronous=NORMAL,
+        # avoids an fsync on every commit. journal_mode persists in the file but
+        # the rest are per-connection, so apply them on every connect.
+        self.conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-40000;
+            PRAGMA mmap_size=268435456;
+            PRAGMA busy_timeout=5000;
+        """)
+        if self.durable:
+            self.conn.execute("PRAGMA synchronous=FULL")
+        # Per-connection staging tables for batched writes; in memory via temp_store
+        self.conn.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS staged_users (
+                username TEXT NOT NULL,
+                price REAL NOT NULL,
+                subscription_status TEXT
+            )
+        """)
+        self.conn.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS staged_user_lists (
+                username TEXT NOT NULL,
+                list_name TEXT
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS temp.idx_staged_user_lists ON staged_user_lists(username, list_name)")
         logger.info(f"Connected to database: {self.db_path}")
 
     def _init_schema(self):
         """Create database schema if it doesn't exist."""
-        cursor = self.conn.cursor()
+        # Checked outside a transaction so opening an up-to-date database never
+        # takes the write lock and can't block behind a running scrape
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+            return
+
+        with self.transaction() as cursor:
+            # Another connection may have migrated while we waited for the lock
+            cursor.execute("PRAGMA user_version")
+            if cursor.fetchone()[0] >= _SCHEMA_VERSION:
+                return
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_price_history_user_time'")
+            needs_analyze = cursor.fetchone() is None
+            self._create_schema(cursor)
+            cursor.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+        # Give the planner statistics for the composite index the first time it appears
+        if needs_analyze:
+            self.conn.execute("ANALYZE")
+        logger.info("Database schema initialized")
 
+    @staticmethod
+    def _create_schema(cursor):
+        """Create the tables and their indexes."""
         # Scrape runs table - tracks each scraping session
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS scrape_runs (
@@ -91,25 +233,57 @@ class Database:
         """)
 
         # Indexes for performance
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_price_history_username ON price_history(username)")
+        # Composite so the PARTITION BY username ORDER BY scraped_at window queries
+        # walk the index in order instead of sorting each partition
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_price_history_user_time ON price_history(username, scraped_at)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_price_history_scraped_at ON price_history(scraped_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_price_history_run ON price_history(scrape_run_id)")
+        # Superseded by idx_price_history_user_time, whose leftmost column covers it
+        cursor.execute("DROP INDEX IF EXISTS idx_price_history_username")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_last_run ON users(last_scraped_run_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_lists_username ON user_lists(username)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_lists_list_name ON user_lists(list_name)")
-
-        self.conn.commit()
-        logger.info("Database schema initialized")
+        # Covers get_users_by_list: the list_name range yields usernames without
+        # touching the table
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_lists_list_user ON user_lists(list_name, username)")
+        cursor.execute("DROP INDEX IF EXISTS idx_user_lists_list_name")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_runs_status_started ON scrape_runs(status, started_at DESC)")
 
     @contextmanager
     def transaction(self):
-        """Context manager for database transactions."""
-        cursor = self.conn.cursor()
-        try:
-            yield cursor
-            self.conn.commit()
-        except Exception as e:
-            self.conn.rollback()
-            logger.error(f"Transaction failed: {e}")
-            raise
+        """Context manager for database transactions, serialized across threads.
+
+        BEGIN IMMEDIATE takes the write lock up front, so a busy database is
+        reported (after busy_timeout) when the transaction starts rather than
+        on its first write.
+        """
+        with self._conn_lock:
+            cursor = self.conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+                cursor.execute("COMMIT")
+            except BaseException as e:
+                # Also covers KeyboardInterrupt; SQLite may already have rolled
+                # back on its own (e.g. SQLITE_FULL), so only roll back if still open
+                if self.conn.in_transaction:
+                    cursor.execute("ROLLBACK")
+                logger.error(f"Transaction failed: {e!r}")
+                raise
+
+    @contextmanager
+    def read_transaction(self):
+        """Context manager that runs a group of queries against one read snapshot.
+
+        Holds the same lock as transaction(): on a shared connection another
+        thread's BEGIN or COMMIT would otherwise collide with this one.
+        """
+        with self._conn_lock:
+            self.conn.execute("BEGIN DEFERRED")
+            try:
+                yield self.conn.cursor()
+            finally:
+                if self.conn.in_transaction:
+                    self.conn.execute("COMMIT")
 
     def start_scrape_run(self, list_id: str, started_at: Optional[datetime] = None) -> int:
         """Start a new scrape run and return its ID.
@@ -156,58 +330,107 @@ class Database:
             scraped_at = datetime.now()
 
         with self.transaction() as cursor:
-            # Check if user exists
-            cursor.execute("SELECT username, current_price FROM users WHERE username = ?", (username,))
-            existing = cursor.fetchone()
-
-            if existing:
-                old_price = existing['current_price']
-
-                # Update user
-                cursor.execute("""
-                    UPDATE users
-                    SET current_price = ?, subscription_status = ?,
-                        last_seen = ?, last_scraped_run_id = ?
-                    WHERE username = ?
-                """, (price, subscription_status, scraped_at, run_id, username))
-
-                # Log price change
-                if old_price != price:
-                    logger.info(f"Price change for {username}: ${old_price} -> ${price}")
-            else:
-                # Insert new user
-                cursor.execute("""
-                    INSERT INTO users (username, current_price, subscription_status,
-                                     first_seen, last_seen, last_scraped_run_id)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (username, price, subscription_status, scraped_at, scraped_at, run_id))
-                logger.debug(f"New user added: {username}")
+            cursor.execute(_SQL_UPSERT_USER,
+                           (username, price, subscription_status, scraped_at, scraped_at, run_id))
 
             # Always insert into price history
-            cursor.execute("""
-                INSERT INTO price_history (username, price, subscription_status,
-                                         scraped_at, scrape_run_id)
-                VALUES (?, ?, ?, ?, ?)
-            """, (username, price, subscription_status, scraped_at, run_id))
+            cursor.execute(_SQL_INSERT_PRICE_HISTORY,
+                           (username, price, subscription_status, scraped_at, run_id))
 
             # Update lists
-            self._update_user_lists(cursor, username, lists, run_id, scraped_at)
+            self._update_user_lists(cursor, {username: lists})
 
-    def _update_user_lists(self, cursor, username: str, current_lists: List[str],
-                           run_id: int, now: datetime):
-        """Update which lists a user belongs to (replaces previous lists)."""
-        # Delete all existing lists for this user
-        cursor.execute("DELETE FROM user_lists WHERE username = ?", (username,))
+    def upsert_users(self, users: List[Tuple[str, float, str, List[str]]], run_id: int,
+                     scraped_at: Optional[datetime] = None):
+        """Insert or update a batch of users in a single transaction.
 
-        # Insert new lists
-        for list_name in current_lists:
-            cursor.execute("""
-                INSERT INTO user_lists (username, list_name)
-                VALUES (?, ?)
-            """, (username, list_name))
+        Committing once per batch rather than once per user means one journal
+        sync for the whole batch.
+
+        Args:
+            users: (username, price, subscription_status, lists) tuples
+            run_id: The scrape run ID
+            scraped_at: Optional timestamp for when this was scraped (defaults to now)
+        """
+        if scraped_at is None:
+            scraped_at = datetime.now()
+
+        # Last occurrence wins if a username appears twice in one batch
+        users = list({user[0]: user for user in users}.values())
+
+        with self.transaction() as cursor:
+            # Stage the batch in memory, then append it to the main tables in two passes
+            cursor.execute("DELETE FROM temp.staged_users")
+            self._stage_rows(cursor, _SQL_STAGE_USER, [
+                (username, price, subscription_status)
+                for username, price, subscription_status, _ in users
+            ])
+            cursor.execute(_SQL_UPSERT_STAGED_USERS, (scraped_at, scraped_at, run_id))
+            cursor.execute(_SQL_INSERT_STAGED_PRICE_HISTORY, (scraped_at, run_id))
+
+            self._update_user_lists(cursor, {username: lists for username, _, _, lists in users})
+
+    @staticmethod
+    def _stage_rows(cursor, insert_sql: str, rows: List[Tuple]):
+        """Insert rows with as few multi-row VALUES statements as possible.
 
-    def get_price_history(self, username: str) -> List[Dict]:
-        """Get price history for a user."""
+        Args:
+            cursor: Cursor inside an open transaction
+            insert_sql: INSERT statement ending in "VALUES "
+            rows: Tuples of equal length, one per row
+        """
+        if not rows:
+            return
+        width = len(rows[0])
+        chunk_size = _MAX_SQL_VARIABLES // width
+        row_placeholder = "(" + ", ".join("?" * width) + ")"
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            placeholders = ", ".join([row_placeholder] * len(chunk))
+            cursor.execute(insert_sql + placeholders, list(chain.from_iterable(chunk)))
+
+    def _update_user_lists(self, cursor, user_lists: Dict[str, List[str]]):
+        """Replace the stored lists of each user with the given ones.
+
+        The desired memberships are staged in a temp table and diffed against
+        user_lists in SQL, so only changed (username, list_name) pairs are written.
+        """
+        cursor.execute("DELETE FROM temp.staged_user_lists")
+        # Users with no lists get a NULL row so their stale memberships are still removed
+        self._stage_rows(cursor, _SQL_STAGE_USER_LIST, [
+            (username, list_name)
+            for username, lists in user_lists.items()
+            for list_name in (lists or [None])
+        ])
+        cursor.execute(_SQL_DELETE_STALE_USER_LISTS)
+        cursor.execute(_SQL_INSERT_NEW_USER_LISTS)
+
+    def get_run_price_changes(self, run_id: int) -> List[Dict]:
+        """Get users whose price in a scrape run differs from their previous record.
+
+        Runs once per scrape instead of reading each user's old price before its upsert.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT username, prev_price, price
+            FROM (
+                SELECT
+                    ph.username,
+                    ph.price,
+                    (SELECT p2.price FROM price_history p2
+                     WHERE p2.username = ph.username AND p2.scraped_at < ph.scraped_at
+                     ORDER BY p2.scraped_at DESC LIMIT 1) as prev_price
+                FROM price_history ph
+                WHERE ph.scrape_run_id = ?
+            )
+            WHERE prev_price IS NOT NULL AND prev_price != price
+            ORDER BY username
+        """, (run_id,))
+
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_price_history(self, username: str) -> List[sqlite3.Row]:
+        """Get price history for a user, as rows indexable by column name."""
         cursor = self.conn.cursor()
         cursor.execute("""
             SELECT price, subscription_status, scraped_at
@@ -216,10 +439,13 @@ class Database:
             ORDER BY scraped_at DESC
         """, (username,))
 
-        return [dict(row) for row in cursor.fetchall()]
+        return cursor.fetchall()
 
     def get_price_changes(self, days: int = 30) -> List[Dict]:
         """Get users whose prices changed in the last N days."""
+        # Bound computed here so SQLite can range-scan idx_price_history_scraped_at
+        since = datetime.now() - timedelta(days=days)
+
         cursor = self.conn.cursor()
         cursor.execute("""
             WITH ranked_prices AS (
@@ -229,13 +455,13 @@ class Database:
                     scraped_at,
                     LAG(price) OVER (PARTITION BY username ORDER BY scraped_at) as prev_price
                 FROM price_history
-                WHERE scraped_at >= datetime('now', '-' || ? || ' days')
+                WHERE scraped_at >= ?
             )
             SELECT username, prev_price, price, scraped_at
             FROM ranked_prices
             WHERE prev_price IS NOT NULL AND prev_price != price
             ORDER BY scraped_at DESC
-        """, (days,))
+        """, (since,))
 
         return [dict(row) for row in cursor.fetchall()]
 
@@ -292,8 +518,8 @@ class Database:
         result = cursor.fetchone()
         return result['id'] if result else None
 
-    def get_users_from_scrape_run(self, run_id: int) -> List[Dict]:
-        """Get users that appeared in a specific scrape run with their current lists."""
+    def get_users_from_scrape_run(self, run_id: int) -> Iterator[Dict]:
+        """Stream users that appeared in a specific scrape run with their current lists."""
         cursor = self.conn.cursor()
 
         cursor.execute("""
@@ -301,23 +527,17 @@ class Database:
                 u.username,
                 u.current_price,
                 u.subscription_status,
-                GROUP_CONCAT(ul.list_name) as lists
+                ul.list_name
             FROM users u
             LEFT JOIN user_lists ul ON u.username = ul.username
             WHERE u.last_scraped_run_id = ?
-            GROUP BY u.username
+            ORDER BY u.username
         """, (run_id,))
 
-        results = []
-        for row in cursor.fetchall():
-            data = dict(row)
-            data['lists'] = data['lists'].split(',') if data['lists'] else []
-            results.append(data)
+        return self._group_user_lists(cursor)
 
-        return results
-
-    def get_users_with_lists(self) -> List[Dict]:
-        """Get all users with their current lists."""
+    def get_users_with_lists(self) -> Iterator[Dict]:
+        """Stream all users with their current lists."""
         cursor = self.conn.cursor()
 
         cursor.execute("""
@@ -325,19 +545,45 @@ class Database:
                 u.username,
                 u.current_price,
                 u.subscription_status,
-                GROUP_CONCAT(ul.list_name) as lists
+                ul.list_name
             FROM users u
             LEFT JOIN user_lists ul ON u.username = ul.username
-            GROUP BY u.username
+            ORDER BY u.username
         """)
 
-        results = []
-        for row in cursor.fetchall():
-            data = dict(row)
-            data['lists'] = data['lists'].split(',') if data['lists'] else []
-            results.append(data)
+        return self._group_user_lists(cursor)
+
+    def get_users_by_list(self, list_name: str) -> List[sqlite3.Row]:
+        """Get the current state of every user in a list, as rows indexable by column name."""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT u.username, u.current_price, u.subscription_status
+            FROM user_lists ul
+            JOIN users u ON u.username = ul.username
+            WHERE ul.list_name = ?
+            ORDER BY ul.username
+        """, (list_name,))
+
+        return cursor.fetchall()
+
+    @staticmethod
+    def _group_user_lists(cursor) -> Iterator[Dict]:
+        """Fold (user, list_name) join rows ordered by username into one dict per user.
 
-        return results
+        Rows are pulled with fetchmany, so callers can start on the first user
+        before the whole result set has been read.
+        """
+        rows = iter(lambda: cursor.fetchmany(1000), [])
+        for username, user_rows in groupby(chain.from_iterable(rows), key=itemgetter('username')):
+            first = next(user_rows)
+            data = {
+                'username': username,
+                'current_price': first['current_price'],
+                'subscription_status': first['subscription_status'],
+                'lists': [first['list_name']] if first['list_name'] is not None else []
+            }
+            data['lists'].extend(row['list_name'] for row in user_rows)
+            yield data
 
     def get_recent_price_drops(self, run_id: int, baseline_days: int = 30,
                                 discount_threshold: float = 0.20) -> List[Dict]:
@@ -410,33 +656,28 @@ class Database:
         """Get database statistics."""
         cursor = self.conn.cursor()
 
-        cursor.execute("SELECT COUNT(*) as total_users FROM users")
-        total_users = cursor.fetchone()['total_users']
-
-        cursor.execute("SELECT COUNT(*) as total_scrapes FROM scrape_runs WHERE status = 'completed'")
-        total_scrapes = cursor.fetchone()['total_scrapes']
-
-        cursor.execute("SELECT COUNT(*) as price_records FROM price_history")
-        price_records = cursor.fetchone()['price_records']
-
+        # All four figures in one round-trip; the last scrape lookup is an
+        # index-only fetch on idx_runs_status_started
         cursor.execute("""
-            SELECT started_at FROM scrape_runs
-            WHERE status = 'completed'
-            ORDER BY started_at DESC LIMIT 1
+            SELECT
+                (SELECT COUNT(*) FROM users) as total_users,
+                (SELECT COUNT(*) FROM scrape_runs WHERE status = 'completed') as total_scrapes,
+                (SELECT COUNT(*) FROM price_history) as price_records,
+                (SELECT started_at FROM scrape_runs
+                 WHERE status = 'completed'
+                 ORDER BY started_at DESC LIMIT 1) as last_scrape
         """)
-        last_scrape = cursor.fetchone()
-        last_scrape_date = last_scrape['started_at'] if last_scrape else None
 
-        return {
-            'total_users': total_users,
-            'total_scrapes': total_scrapes,
-            'price_records': price_records,
-            'last_scrape': last_scrape_date
-        }
+        return dict(cursor.fetchone())
 
     def close(self):
         """Close database connection."""
         if self.conn:
+            # Refresh planner statistics that have gone stale; near-free otherwise
+            try:
+                self.conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                logger.debug(f"PRAGMA optimize failed: {e}")
             self.conn.close()
             logger.info("Database connection closed")
 
@@ -1,12 +1,20 @@
 """Database-based analyzer with historical price tracking."""
 import logging
 import json
+import sys
 from pathlib import Path
 from typing import Optional, List, Dict
 from datetime import datetime, timedelta
+from itertools import groupby, islice
+from operator import itemgetter
 
 from database import Database
 
+try:
+    import orjson
+except ImportError:  # Optional speedup, install with the 'fast' extra
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,32 +30,34 @@ class DatabaseAnalyser:
         """Run all analysis methods."""
         logger.info("Running comprehensive analysis...")
 
-        self.show_stats()
-        self.find_free_accounts()  # Primary target - free unsubscribed accounts
-        self.find_recent_price_drops()  # New deals - recently discounted
-        self.find_categorization_issues()
+        # Share one snapshot across all reports rather than one per statement
+        with self.db.read_transaction():
+            self.show_stats()
+            self.find_free_accounts()  # Primary target - free unsubscribed accounts
+            self.find_recent_price_drops()  # New deals - recently discounted
+            self.find_categorization_issues()
 
     def show_stats(self):
         """Show database statistics."""
         stats = self.db.get_stats()
 
-        print("\n" + "="*60)
-        print("DATABASE STATISTICS")
-        print("="*60)
-        print(f"Total Users:       {stats['total_users']}")
-        print(f"Total Scrapes:     {stats['total_scrapes']}")
-        print(f"Price Records:     {stats['price_records']}")
-        print(f"Last Scrape:       {stats['last_scrape'] or 'Never'}")
-        print("="*60)
+        self._write([
+            "\n" + "="*60,
+            "DATABASE STATISTICS",
+            "="*60,
+            f"Total Users:       {stats['total_users']}",
+            f"Total Scrapes:     {stats['total_scrapes']}",
+            f"Price Records:     {stats['price_records']}",
+            f"Last Scrape:       {stats['last_scrape'] or 'Never'}",
+            "="*60,
+        ])
 
     def find_free_accounts(self):
         """Find free trial accounts not yet subscribed - PRIMARY TARGET."""
         # Only show users from the most recent scrape run
         latest_run_id = self.db.get_latest_scrape_run_id()
         if not latest_run_id:
-            print("\n" + "="*70)
-            print("No completed scrape runs found!")
-            print("="*70)
+            self._write(["\n" + "="*70, "No completed scrape runs found!", "="*70])
             return
 
         users = self.db.get_users_from_scrape_run(latest_run_id)
@@ -59,16 +69,6 @@ class DatabaseAnalyser:
         ]
 
         if free_users:
-            print("\n" + "="*70)
-            print("FREE ACCOUNTS YOU'RE NOT SUBSCRIBED TO")
-            print(f"Total: {len(free_users)} free trial accounts")
-            print("="*70)
-            for user in free_users:  # Show all free accounts
-                lists_str = ', '.join(user['lists']) if user['lists'] else 'No lists'
-                print(f"  ✓ https://onlyfans.com/{user['username']}")
-                print(f"    Lists: {lists_str}")
-            print("="*70)
-
             # Save all free accounts to log file
             free_accounts_log = [
                 {
@@ -79,11 +79,24 @@ class DatabaseAnalyser:
                 }
                 for u in free_users
             ]
-            self._save_free_accounts_to_log(free_accounts_log)
+            log_file = self._save_free_accounts_to_log(free_accounts_log)
+
+            out = [
+                "\n" + "="*70,
+                "FREE ACCOUNTS YOU'RE NOT SUBSCRIBED TO",
+                f"Total: {len(free_users)} free trial accounts",
+                "="*70,
+            ]
+            for user in free_users:  # Show all free accounts
+                lists_str = ', '.join(user['lists']) if user['lists'] else 'No lists'
+                out.extend([
+                    f"  ✓ https://onlyfans.com/{user['username']}",
+                    f"    Lists: {lists_str}",
+                ])
+            out.extend(["="*70, f"✓ All free accounts saved to: {log_file}"])
+            self._write(out)
         else:
-            print("\n" + "="*70)
-            print("No free accounts found!")
-            print("="*70)
+            self._write(["\n" + "="*70, "No free accounts found!", "="*70])
 
     def find_recent_price_drops(self):
         """Find users with recent significant price drops (new good deals)."""
@@ -100,12 +113,14 @@ class DatabaseAnalyser:
         )
 
         if drops:
-            print("\n" + "="*70)
-            print(f"NEW DEALS - RECENT PRICE DROPS ({len(drops)})")
-            print("="*70)
-            print("Users with significant recent price decreases:")
-            print("(Compared to 30-day average, excluding stale deals)")
-            print()
+            out = [
+                "\n" + "="*70,
+                f"NEW DEALS - RECENT PRICE DROPS ({len(drops)})",
+                "="*70,
+                "Users with significant recent price decreases:",
+                "(Compared to 30-day average, excluding stale deals)",
+                "",
+            ]
 
             for drop in drops[:25]:  # Show top 25
                 username = drop['username']
@@ -114,11 +129,13 @@ class DatabaseAnalyser:
                 discount = drop['discount_percent']
                 reason = drop['reason']
 
-                print(f"🎉 https://onlyfans.com/{username}")
-                print(f"   ${avg_price:.2f} → ${current_price:.2f} ({discount}% off) [{reason}]")
+                out.extend([
+                    f"🎉 https://onlyfans.com/{username}",
+                    f"   ${avg_price:.2f} → ${current_price:.2f} ({discount}% off) [{reason}]",
+                ])
 
             if len(drops) > 25:
-                print(f"\n... and {len(drops) - 25} more")
+                out.append(f"\n... and {len(drops) - 25} more")
 
             # Save all deals to log file
             deals_log = [
@@ -132,10 +149,27 @@ class DatabaseAnalyser:
                 }
                 for d in drops
             ]
-            self._save_deals_to_log(deals_log)
+            log_file = self._save_deals_to_log(deals_log)
+            out.append(f"✓ All recent deals saved to: {log_file}")
+            self._write(out)
+
+    @staticmethod
+    def _write(lines: List[str]):
+        """Write a report block to stdout in a single call."""
+        sys.stdout.write("\n".join(lines) + "\n")
+
+    @staticmethod
+    def _write_json(report: Dict, log_file: Path):
+        """Write a JSON report, using orjson when it is installed."""
+        if orjson is not None:
+            with open(log_file, 'wb') as f:
+                f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+        else:
+            with open(log_file, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
 
-    def _save_free_accounts_to_log(self, accounts: List[Dict], filename: str = "free_accounts.txt"):
-        """Save all free accounts to a text file with one URL per line."""
+    def _save_free_accounts_to_log(self, accounts: List[Dict], filename: str = "free_accounts.txt") -> Path:
+        """Save all free accounts to a text file with one URL per line and return its path."""
         log_dir = Path("logs")
         log_dir.mkdir(exist_ok=True)
 
@@ -146,10 +180,10 @@ class DatabaseAnalyser:
                 f.write(account['url'] + '\n')
 
         logger.info(f"Free accounts saved to {log_file}")
-        print(f"✓ All free accounts saved to: {log_file}")
+        return log_file
 
-    def _save_deals_to_log(self, deals: List[Dict], filename: str = "recent_deals.json"):
-        """Save all recent deals to a JSON log file."""
+    def _save_deals_to_log(self, deals: List[Dict], filename: str = "recent_deals.json") -> Path:
+        """Save all recent deals to a JSON log file and return its path."""
         log_dir = Path("logs")
         log_dir.mkdir(exist_ok=True)
 
@@ -162,14 +196,13 @@ class DatabaseAnalyser:
             "deals": deals
         }
 
-        with open(log_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        self._write_json(report, log_file)
 
         logger.info(f"Recent deals saved to {log_file}")
-        print(f"✓ All recent deals saved to: {log_file}")
+        return log_file
 
-    def _save_issues_to_log(self, issues: List[Dict], filename: str = "issues_report.json"):
-        """Save all issues to a JSON log file without truncation."""
+    def _save_issues_to_log(self, issues: List[Dict], filename: str = "issues_report.json") -> Path:
+        """Save all issues to a JSON log file without truncation and return its path."""
         log_dir = Path("logs")
         log_dir.mkdir(exist_ok=True)
 
@@ -182,11 +215,10 @@ class DatabaseAnalyser:
             "issues": issues
         }
 
-        with open(log_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        self._write_json(report, log_file)
 
         logger.info(f"Issues saved to {log_file}")
-        print(f"✓ Full issues report saved to: {log_file}")
+        return log_file
 
     def find_categorization_issues(self):
         """Find users with incorrect list categorization from the most recent scrape."""
@@ -223,27 +255,35 @@ class DatabaseAnalyser:
                 })
 
         if issues:
-            print("\n" + "="*60)
-            print(f"CATEGORIZATION ISSUES ({len(issues)})")
-            print("="*60)
+            # Save all issues to log file without truncation
+            log_file = self._save_issues_to_log(issues)
+
+            out = [
+                "\n" + "="*60,
+                f"CATEGORIZATION ISSUES ({len(issues)})",
+                "="*60,
+            ]
             for issue in issues[:15]:  # Show first 15 in console
                 lists_str = ', '.join(issue['lists'])
-                print(f"{issue['issue']}: https://onlyfans.com/{issue['username']}")
-                print(f"  Price: ${issue['price']}, Lists: {lists_str}")
+                out.extend([
+                    f"{issue['issue']}: https://onlyfans.com/{issue['username']}",
+                    f"  Price: ${issue['price']}, Lists: {lists_str}",
+                ])
             if len(issues) > 15:
-                print(f"... and {len(issues) - 15} more (see logs/issues_report.json for full list)")
-
-            # Save all issues to log file without truncation
-            self._save_issues_to_log(issues)
+                out.append(f"... and {len(issues) - 15} more (see logs/issues_report.json for full list)")
+            out.append(f"✓ Full issues report saved to: {log_file}")
+            self._write(out)
 
     def find_price_changes_recently(self, days: int = 30):
         """Find users whose prices changed in the last N days."""
         changes = self.db.get_price_changes(days)
 
         if changes:
-            print("\n" + "="*60)
-            print(f"PRICE CHANGES (Last {days} Days) - {len(changes)} changes")
-            print("="*60)
+            out = [
+                "\n" + "="*60,
+                f"PRICE CHANGES (Last {days} Days) - {len(changes)} changes",
+                "="*60,
+            ]
 
             for change in changes[:15]:  # Limit to 15
                 prev_price = change['prev_price']
@@ -251,11 +291,14 @@ class DatabaseAnalyser:
                 change_date = change['scraped_at']
 
                 arrow = "↓" if new_price < prev_price else "↑"
-                print(f"{arrow} https://onlyfans.com/{change['username']}")
-                print(f"  ${prev_price} → ${new_price} on {change_date}")
+                out.extend([
+                    f"{arrow} https://onlyfans.com/{change['username']}",
+                    f"  ${prev_price} → ${new_price} on {change_date}",
+                ])
 
             if len(changes) > 15:
-                print(f"\n... and {len(changes) - 15} more")
+                out.append(f"\n... and {len(changes) - 15} more")
+            self._write(out)
 
     def find_historical_lows(self):
         """Find users from the latest scrape currently at their historical low price."""
@@ -267,74 +310,85 @@ class DatabaseAnalyser:
         lows = self.db.get_historical_low_prices(latest_run_id)
 
         if lows:
-            print("\n" + "="*60)
-            print(f"HISTORICAL LOW PRICES ({len(lows)})")
-            print("="*60)
-            print("Users at their lowest price ever (from this scrape):")
-            print()
+            out = [
+                "\n" + "="*60,
+                f"HISTORICAL LOW PRICES ({len(lows)})",
+                "="*60,
+                "Users at their lowest price ever (from this scrape):",
+                "",
+            ]
 
             for low in lows[:20]:  # Limit to 20
-                print(f"💰 https://onlyfans.com/{low['username']}")
-                print(f"   Current: ${low['current_price']} (seen {low['scrape_count']} times)")
+                out.extend([
+                    f"💰 https://onlyfans.com/{low['username']}",
+                    f"   Current: ${low['current_price']} (seen {low['scrape_count']} times)",
+                ])
 
             if len(lows) > 20:
-                print(f"\n... and {len(lows) - 20} more")
+                out.append(f"\n... and {len(lows) - 20} more")
+            self._write(out)
 
     def find_trending_prices(self):
         """Find users with consistent price decreases (trending cheaper)."""
+        since = datetime.now() - timedelta(days=60)
         cursor = self.db.conn.cursor()
 
-        # Get users with at least 3 price records
+        # Walk idx_price_history_user_time in order rather than windowing the table
         cursor.execute("""
-            WITH price_trends AS (
-                SELECT
-                    username,
-                    price,
-                    scraped_at,
-                    LAG(price, 1) OVER (PARTITION BY username ORDER BY scraped_at) as prev_price,
-                    LAG(price, 2) OVER (PARTITION BY username ORDER BY scraped_at) as prev_price_2
-                FROM price_history
-                WHERE scraped_at >= datetime('now', '-60 days')
-            )
-            SELECT username, prev_price_2, prev_price, price
-            FROM price_trends
-            WHERE prev_price_2 IS NOT NULL
-              AND prev_price < prev_price_2
-              AND price < prev_price
-            GROUP BY username
-            ORDER BY (prev_price_2 - price) DESC
-            LIMIT 20
-        """)
-
-        trends = [dict(row) for row in cursor.fetchall()]
+            SELECT username, price
+            FROM price_history
+            WHERE scraped_at >= ?
+            ORDER BY username, scraped_at DESC
+        """, (since,))
+
+        trends = []
+        for username, rows in groupby(cursor, key=itemgetter('username')):
+            # Latest three records, newest first; skip users with fewer
+            latest = [row['price'] for row in islice(rows, 3)]
+            if len(latest) == 3 and latest[0] < latest[1] < latest[2]:
+                trends.append({
+                    'username': username,
+                    'prev_price_2': latest[2],
+                    'prev_price': latest[1],
+                    'price': latest[0]
+                })
+
+        trends.sort(key=lambda t: t['prev_price_2'] - t['price'], reverse=True)
+        trends = trends[:20]
 
         if trends:
-            print("\n" + "="*60)
-            print(f"TRENDING CHEAPER ({len(trends)})")
-            print("="*60)
-            print("Users with consistently decreasing prices:")
-            print()
+            out = [
+                "\n" + "="*60,
+                f"TRENDING CHEAPER ({len(trends)})",
+                "="*60,
+                "Users with consistently decreasing prices:",
+                "",
+            ]
 
             for trend in trends:
-                print(f"📉 https://onlyfans.com/{trend['username']}")
-                print(f"   ${trend['prev_price_2']} → ${trend['prev_price']} → ${trend['price']}")
+                out.extend([
+                    f"📉 https://onlyfans.com/{trend['username']}",
+                    f"   ${trend['prev_price_2']} → ${trend['prev_price']} → ${trend['price']}",
+                ])
+            self._write(out)
 
     def get_user_history(self, username: str):
         """Get price history for a specific user."""
         history = self.db.get_price_history(username)
 
         if history:
-            print(f"\n" + "="*60)
-            print(f"PRICE HISTORY: @{username}")
-            print("="*60)
-
-            for record in history:
-                status = record['subscription_status']
-                date = record['scraped_at']
-                price = record['price']
-                print(f"  {date}: ${price} ({status})")
+            out = [
+                "\n" + "="*60,
+                f"PRICE HISTORY: @{username}",
+                "="*60,
+            ]
+            out.extend(
+                f"  {record['scraped_at']}: ${record['price']} ({record['subscription_status']})"
+                for record in history
+            )
         else:
-            print(f"No history found for @{username}")
+            out = [f"No history found for @{username}"]
+        self._write(out)
 
     def close(self):
         """Close database connection."""
@@ -1,19 +1,20 @@
+import atexit
 import logging
 import time
 import re
 import socket
 import os
-from collections import defaultdict
-from typing import Optional, Dict, List
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Dict, List, Set, Tuple
 from pathlib import Path
 
 from price_parser import Price
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, StaleElementReferenceException, ElementNotInteractableException
+from selenium.common.exceptions import (NoSuchElementException, TimeoutException, ElementNotInteractableException,
+                                        JavascriptException)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
 from database import Database
 import subprocess
@@ -27,6 +28,98 @@ PRICE_SELECTOR = ".b-wrap-btn-text"
 AVATAR_SELECTOR = "a.g-avatar img"
 DISPLAY_NAME_SELECTOR = "div.g-user-name"
 LIST_SELECTOR = "span.b-list-titles__item__text"
+# Subscription statuses stored for each user; UNKNOWN_VALUE also stands in for
+# a price that could not be scraped
+STATUS_SUBSCRIBED = "SUBSCRIBED"
+STATUS_NO_SUBSCRIPTION = "NO_SUBSCRIPTION"
+STATUS_INVALID = "INVALID"
+UNKNOWN_VALUE = "?"
+
+# Offer durations such as "20% off for 30 days", matched against uppercased text
+DAYS_PATTERN = re.compile(r'\b\d+\s*DAYS?\b')
+
+SCROLLER_VIEW_SELECTOR = ".vue-recycle-scroller__item-view"
+SCROLLER_READY_SELECTOR = ".vue-recycle-scroller.ready"
+
+# Reads rendered user cards in one WebDriver round-trip instead of several
+# find_element calls per card. The virtual scroller positions each view with
+# translateY, so cards above arguments[0] (already scraped) are skipped in the
+# browser; cards outside a scroller view have no offset and are always returned.
+# List names come back sorted, without the "Lists" header item.
+USER_CARDS_SCRIPT = f"""
+const minOffset = arguments[0];
+const cards = [];
+for (const card of document.querySelectorAll('{USER_ITEM_SELECTOR}')) {{
+    const view = card.closest('{SCROLLER_VIEW_SELECTOR}');
+    const match = view ? /translateY\\((-?[\\d.]+)px\\)/.exec(view.style.transform) : null;
+    const offset = match ? parseFloat(match[1]) : null;
+    if (offset !== null && offset < minOffset) {{
+        continue;
+    }}
+    const username = card.querySelector('{USERNAME_SELECTOR}');
+    const price = card.querySelector('{PRICE_SELECTOR}');
+    cards.push({{
+        username: username ? username.innerText : '',
+        price_text: price ? price.textContent : '',
+        lists: Array.from(card.querySelectorAll('{LIST_SELECTOR}'))
+            .map(item => item.innerText)
+            .filter(name => name !== 'Lists')
+            .sort(),
+        offset: offset
+    }});
+}}
+return cards;
+"""
+
+# Resolves as soon as a selector matches, using a MutationObserver rather than
+# WebDriver polling. Class changes are observed too, since the scroller only
+# gains its "ready" class after mounting. Resolves false after arguments[1] ms.
+WAIT_FOR_SELECTOR_SCRIPT = """
+const [selector, timeoutMs, done] = arguments;
+if (document.querySelector(selector)) {
+    done(true);
+    return;
+}
+const observer = new MutationObserver(() => {
+    if (document.querySelector(selector)) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(true);
+    }
+});
+const timer = setTimeout(() => {
+    observer.disconnect();
+    done(false);
+}, timeoutMs);
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, attributeFilter: ['class']});
+"""
+
+# Scrolls to the bottom, then checks the card count, page height and last
+# rendered username on every animation frame and resolves true as soon as any of
+# them changes (recycled views keep the count constant), or false after
+# arguments[0] ms. Hidden tabs get no animation frames, so fall back to timers.
+SCROLL_TO_BOTTOM_SCRIPT = f"""
+const [timeoutMs, done] = arguments;
+function renderState() {{
+    const cards = document.querySelectorAll('{USER_ITEM_SELECTOR}');
+    const last = cards.length ? cards[cards.length - 1].querySelector('{USERNAME_SELECTOR}') : null;
+    return JSON.stringify([cards.length, document.body.scrollHeight, last ? last.innerText : '']);
+}}
+const nextFrame = document.hidden ? (check => setTimeout(check, 100)) : requestAnimationFrame;
+const before = renderState();
+const deadline = performance.now() + timeoutMs;
+window.scrollTo(0, document.body.scrollHeight);
+function check() {{
+    if (renderState() !== before) {{
+        done(true);
+    }} else if (performance.now() >= deadline) {{
+        done(false);
+    }} else {{
+        nextFrame(check);
+    }}
+}}
+nextFrame(check);
+"""
 
 # Chrome configuration - read from environment variables with platform-specific defaults
 if os.name == 'nt':  # Windows
@@ -39,6 +132,7 @@ else:  # macOS/Linux
 CHROME_PATH = os.getenv("CHROME_PATH", DEFAULT_CHROME_PATH)
 USER_DATA_DIR = os.getenv("USER_DATA_DIR", DEFAULT_USER_DATA_DIR)
 DEBUGGING_PORT = os.getenv("CHROME_DEBUG_PORT", "9222")
+CHROME_STARTUP_TIMEOUT = 10  # seconds
 
 class PriceNotFoundError(Exception):
     pass
@@ -46,17 +140,20 @@ class PriceNotFoundError(Exception):
 # Global reference to Chrome process for cleanup
 _chrome_process = None
 
+def _debug_port_open(timeout: float = 0.2) -> bool:
+    """Check whether a browser is listening on the debugging port."""
+    try:
+        with socket.create_connection(("localhost", int(DEBUGGING_PORT)), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
 def start_chrome():
     """Start a Chrome process for remote debugging, or reuse existing."""
     global _chrome_process
 
     # Check if a Chrome process is already running on the debugging port
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(1)
-    result = sock.connect_ex(("localhost", int(DEBUGGING_PORT)))
-    sock.close()
-
-    if result == 0:
+    if _debug_port_open():
         logging.info(f"Connected to existing Chrome process on port {DEBUGGING_PORT}")
         return  # Already running, don't start a new one
 
@@ -69,9 +166,27 @@ def start_chrome():
     ]
 
     try:
-        _chrome_process = subprocess.Popen(command)
+        # Chrome's output isn't read, so don't hand it our stdio or other handles
+        popen_kwargs = {}
+        if os.name == 'nt':
+            popen_kwargs['creationflags'] = subprocess.DETACHED_PROCESS
+        _chrome_process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=True,
+            **popen_kwargs
+        )
         logging.info(f"Started new Chrome process (PID: {_chrome_process.pid})")
-        time.sleep(3)  # Wait for Chrome to start
+        atexit.register(close_chrome)
+        # Wait for Chrome to start listening rather than for a fixed delay
+        deadline = time.monotonic() + CHROME_STARTUP_TIMEOUT
+        while not _debug_port_open() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if not _debug_port_open():
+            logging.warning(f"Chrome is not listening on debugging port {DEBUGGING_PORT} "
+                            f"after {CHROME_STARTUP_TIMEOUT}s; connecting to it may fail")
     except Exception as e:
         logging.error(f"Failed to start Chrome: {e}")
         raise
@@ -95,6 +210,36 @@ def close_chrome():
         _chrome_process = None
 
 
+# WebDriver session shared by every scraper in this process; quit at exit
+_driver = None
+
+def get_driver():
+    """Attach a WebDriver to the debugging Chrome, reusing this process's session."""
+    global _driver
+
+    if _driver is None:
+        options = webdriver.ChromeOptions()
+        options.add_argument("start-maximized")
+        options.add_argument("incognito")
+        options.add_argument("disable-extensions")
+        options.add_experimental_option("debuggerAddress", f"localhost:{DEBUGGING_PORT}")
+        _driver = webdriver.Chrome(options=options)
+        # Registered after start_chrome's hook, so it runs first
+        atexit.register(quit_driver)
+    return _driver
+
+def quit_driver():
+    """Quit the shared WebDriver session, if one was started."""
+    global _driver
+
+    if _driver is not None:
+        try:
+            _driver.quit()
+        except Exception as e:
+            logging.warning(f"Failed to quit WebDriver: {e}")
+        _driver = None
+
+
 class OnlyFansScraper:
     def __init__(self, db_path: Optional[Path] = None):
         """Initialize scraper.
@@ -103,62 +248,61 @@ class OnlyFansScraper:
             db_path: Path to database file (optional, defaults to data/scraper.db)
         """
         start_chrome()
-        self.driver = self._setup_driver()
-        self.seen_users = defaultdict(bool)
+        self.driver = get_driver()
+        self.seen_users: Set[str] = set()
         self.db = Database(db_path)
         self.current_run_id = None
-
-    @staticmethod
-    def _setup_driver():
-        options = webdriver.ChromeOptions()
-        options.add_argument("start-maximized")
-        options.add_argument("incognito")
-        options.add_argument("disable-extensions")
-        options.add_experimental_option("debuggerAddress", "localhost:9222")
-        return webdriver.Chrome(options=options)
+        self.current_run_time = None
+        self.last_offset = 0.0
 
     def get_user_elements(self) -> List[WebElement]:
         return self.driver.find_elements(By.CSS_SELECTOR, USER_ITEM_SELECTOR)
 
-    def get_new_user_elements(self) -> List[WebElement]:
-        """Get only user elements we haven't seen before (optimization for Vue virtual scrolling)"""
-        all_elements = self.driver.find_elements(By.CSS_SELECTOR, USER_ITEM_SELECTOR)
-        new_elements = []
+    def fetch_all_user_data_js(self) -> List[Dict]:
+        """Read raw username, price text and lists for rendered cards at or below last_offset."""
+        return self.driver.execute_script(USER_CARDS_SCRIPT, self.last_offset)
 
-        for elem in all_elements:
-            try:
-                # Quick check - has this element been processed?
-                username_elem = elem.find_element(By.CSS_SELECTOR, USERNAME_SELECTOR)
-                username = username_elem.text.strip()
-
-                if username:
-                    # Remove @ if present
-                    username = username[1:] if username.startswith('@') else username
-
-                    if username and not self.seen_users.get(username):
-                        new_elements.append(elem)
-            except (NoSuchElementException, StaleElementReferenceException):
-                # Element might be stale from Vue re-rendering, skip it
+    def get_new_user_data(self) -> List[Dict]:
+        """Get only user cards we haven't seen before (optimization for Vue virtual scrolling)"""
+        new_cards = []
+        for card in self.fetch_all_user_data_js():
+            username = card['username'].strip()
+            # Remove @ if present
+            username = username[1:] if username.startswith('@') else username
+
+            # Next scroll only needs cards from the lowest populated one so far
+            if username and card['offset'] is not None:
+                self.last_offset = max(self.last_offset, card['offset'])
+
+            # Skip cards already scraped before doing any further parsing
+            if not username or username in self.seen_users:
                 continue
 
-        return new_elements
+            new_cards.append({
+                "username": username,
+                # Normalize whitespace (remove newlines and extra spaces)
+                "price_text": ' '.join(card['price_text'].split()),
+                # Already filtered and sorted by the script
+                "lists": card['lists']
+            })
+        return new_cards
 
     def scrape_list(self, list_id) -> Path:
         url = BASE_URL.format(list_id)
         self.driver.get(url)
         self.wait_until_page_loads()
 
-        # Initialize database scrape run
-        self.current_run_id = self.db.start_scrape_run(list_id)
+        # Initialize database scrape run. Every user in the run shares this
+        # timestamp so price_history rows from one run compare equal.
+        self.current_run_time = datetime.now()
+        self.last_offset = 0.0
+        self.current_run_id = self.db.start_scrape_run(list_id, self.current_run_time)
         logging.info(f"Started scrape run #{self.current_run_id} for list {list_id}")
 
         # Wait for Vue virtual scroller to initialize
-        try:
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".vue-recycle-scroller.ready"))
-            )
+        if self.wait_for_selector(SCROLLER_READY_SELECTOR, 10):
             logging.info("Vue scroller initialized")
-        except TimeoutException:
+        else:
             logging.warning("Vue scroller not found, continuing anyway...")
 
         no_new_items_count = 0
@@ -173,16 +317,13 @@ class OnlyFansScraper:
 
             old_user_count = len(self.seen_users)
 
-            # Scroll to bottom to trigger Vue to load more items
+            # Scroll to bottom to trigger Vue to load more items, and wait for them to render
             self.scroll_to_bottom()
 
-            # Wait for Vue to render new items
-            self.wait_for_vue_items_to_render()
-
             # Scrape only NEW visible items (optimization)
-            new_elements = self.get_new_user_elements()
-            if new_elements:
-                self.write_to_database(new_elements)
+            new_cards = self.get_new_user_data()
+            if new_cards:
+                self.write_to_database(new_cards)
 
                 new_user_count = len(self.seen_users)
                 newly_added = new_user_count - old_user_count
@@ -198,72 +339,76 @@ class OnlyFansScraper:
         # Complete the scrape
         logging.info(f"Scraping complete. Total users: {len(self.seen_users)}")
         self.db.complete_scrape_run(self.current_run_id, len(self.seen_users), 'completed')
+        for change in self.db.get_run_price_changes(self.current_run_id):
+            logging.info(f"Price change for {change['username']}: ${change['prev_price']} -> ${change['price']}")
         return self.db.db_path
 
-    def write_to_database(self, user_elements):
+    def write_to_database(self, user_cards: List[Dict]):
         """Write user data to SQLite database with batch processing"""
         new_users = []
 
         # Collect all new user data first
-        for user_element in user_elements:
-            user_info = self.scrape_info(user_element)
-            if user_info and not self.seen_users.get(user_info['username']):
+        for user_card in user_cards:
+            # Dedup before parsing; the same user can appear twice in one batch
+            if user_card['username'] in self.seen_users:
+                continue
+            user_info = self.scrape_info(user_card)
+            if user_info:
                 new_users.append(user_info)
-                self.seen_users[user_info['username']] = True
+                self.seen_users.add(user_info['username'])
 
-        # Batch write to database
-        for user in new_users:
-            try:
-                # Convert price string to float
-                try:
-                    price_float = float(user['price']) if user['price'] != '?' else 0.0
-                except ValueError:
-                    price_float = 0.0
-
-                self.db.upsert_user(
-                    username=user['username'],
-                    price=price_float,
-                    subscription_status=user['subscription_status'],
-                    lists=user['lists'],
-                    run_id=self.current_run_id
-                )
-                logging.info(f"Scraped {user['username']}")
-            except Exception as e:
-                logging.error(f"Failed to save {user['username']} to database: {e}")
+        if not new_users:
+            return
 
-    def scrape_info(self, user_element: WebElement) -> Optional[Dict]:
+        rows = [self._parse_row(user) for user in new_users]
 
-        username: str = ""
+        # Batch write to database - one transaction per scroll batch
+        try:
+            self.db.upsert_users(rows, self.current_run_id, self.current_run_time)
+            for user in new_users:
+                logging.info(f"Scraped {user['username']}")
+        except Exception as e:
+            logging.error(f"Failed to save batch of {len(new_users)} users to database: {e}")
 
+    @staticmethod
+    def _parse_row(user: Dict) -> Tuple[str, float, str, List[str]]:
+        """Convert scraped user info into a positional row for Database.upsert_users."""
         try:
-            username: str = self.get_username(user_element)
+            price = float(user['price'])
+        except ValueError:
+            # Unknown prices are scraped as UNKNOWN_VALUE
+            price = 0.0
+        return user['username'], price, user['subscription_status'], user['lists']
+
+    def scrape_info(self, user_card: Dict) -> Optional[Dict]:
 
-            if username is None or username == "":
+        username: str = user_card['username']
+
+        try:
+            if not username:
                 return None
 
-            price_element_text: str = self.get_price_text(user_element)
-            lists_text: List[str] = self.get_lists(user_element)
+            price_element_text: str = user_card['price_text']
+            lists_text: List[str] = user_card['lists']
 
             if not price_element_text:
                 return self.unknown_user_info(username)
 
             try:
-                offer = self.get_offer(price_element_text)
-                price = self.get_price(price_element_text, offer)
-                subscription_status: str = self.get_subscription_status(price_element_text)
+                offer, price, subscription_status = self._parse_price_block(price_element_text)
             except (PriceNotFoundError, IndexError) as e:
                 logging.warning(f"Price parsing failed for user {username}: {str(e)}")
                 logging.warning(f"  Raw price text was: '{price_element_text}'")
                 return self.unknown_user_info(username)
+            # Logged here rather than in the cached parser so every occurrence is reported
+            if subscription_status == STATUS_INVALID:
+                logging.warning(f"Unknown subscription status for user {username} in text: '{price_element_text}'")
             return {
                 "username": username,
                 "subscription_status": subscription_status,
                 "price": price,
                 "lists": lists_text
             }
-        except NoSuchElementException as e:
-            logging.warning(f"Failed to scrape info for user {username}: {str(e)}")
-            return None
         except Exception as e:
             logging.error(f"Unexpected error while scraping user {username}: {str(e)}")
             return None
@@ -272,45 +417,20 @@ class OnlyFansScraper:
     def unknown_user_info(username: str) -> Dict[str, str]:
         return {
             "username": username,
-            "price": "?",
-            "subscription_status": "?",
+            "price": UNKNOWN_VALUE,
+            "subscription_status": UNKNOWN_VALUE,
             "lists": []
         }
 
-    def scroll_to_bottom(self):
-        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-
-    @staticmethod
-    def get_username(user_element: WebElement) -> str:
-        """Get username with fallback selectors for robustness"""
-        selectors = [
-            "div.g-user-username",
-            "div.b-username-row div.g-user-username",
-            "a[href*='onlyfans.com/'] div.g-user-username"
-        ]
-
-        for selector in selectors:
-            try:
-                elem = user_element.find_element(By.CSS_SELECTOR, selector)
-                username = elem.text.strip()
-                if username:
-                    # Remove @ if present
-                    return username[1:] if username.startswith('@') else username
-            except NoSuchElementException:
-                continue
-
-        raise NoSuchElementException("Could not find username with any selector")
-
-    @staticmethod
-    def get_price_text(user_element: WebElement) -> str:
+    def scroll_to_bottom(self, timeout=5) -> bool:
+        """Scroll to the bottom and wait, in the same call, for Vue to render new items."""
         try:
-            elem = user_element.find_element(By.CSS_SELECTOR, PRICE_SELECTOR)
-            # Get all text including nested spans (like g-btn__new-line-text)
-            text = elem.get_attribute('textContent') or elem.text
-            # Normalize whitespace (remove newlines and extra spaces)
-            return ' '.join(text.split())
-        except NoSuchElementException:
-            return ""
+            rendered = self.driver.execute_async_script(SCROLL_TO_BOTTOM_SCRIPT, int(timeout * 1000))
+        except TimeoutException:
+            rendered = False
+        if not rendered:
+            logging.info(f"No new items rendered within {timeout}s")
+        return bool(rendered)
 
     def get_avatar_url(self) -> str:
         return self.driver.find_element(By.CSS_SELECTOR, AVATAR_SELECTOR).get_property("src")
@@ -323,28 +443,21 @@ class OnlyFansScraper:
             return elements[0].text
         return ""
 
-    def wait_until_page_loads(self):
+    def wait_for_selector(self, selector: str, timeout: float) -> bool:
+        """Block until selector matches, notified by the page instead of polling."""
         try:
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, USER_ITEM_SELECTOR))
-            )
+            return bool(self.driver.execute_async_script(WAIT_FOR_SELECTOR_SCRIPT, selector, int(timeout * 1000)))
         except TimeoutException:
-            logging.error("Timeout waiting for page to load")
-
-    def wait_for_vue_items_to_render(self, timeout=10) -> bool:
-        """Wait for Vue virtual scroller to render new items after scroll"""
-        try:
-            # Wait for Vue scroller to be present and ready
-            WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".vue-recycle-scroller__item-wrapper"))
-            )
-            # Brief pause for Vue to finish rendering items
-            time.sleep(0.5)
-            return True
-        except TimeoutException:
-            logging.warning("Timeout waiting for Vue items to render")
+            return False
+        except JavascriptException as e:
+            # e.g. the page navigated away while the observer was waiting
+            logging.warning(f"Script error while waiting for selector '{selector}': {e.msg}")
             return False
 
+    def wait_until_page_loads(self):
+        if not self.wait_for_selector(USER_ITEM_SELECTOR, 20):
+            logging.error("Timeout waiting for page to load")
+
     def check_for_page_errors(self) -> bool:
         """Check if page shows error state and try to recover"""
         try:
@@ -381,19 +494,27 @@ class OnlyFansScraper:
             return False  # No error
 
     @staticmethod
-    def get_lists(user_element: WebElement) -> List[str]:
-        lists_elements = user_element.find_elements(By.CSS_SELECTOR, LIST_SELECTOR)
-        lists: List[str] = [element.text for element in lists_elements if element.text != "Lists"]
-        lists.sort()
-        return lists
+    @lru_cache(maxsize=4096)
+    def _parse_price_block(price_text: str) -> Tuple[str, str, str]:
+        """Parse offer, price and subscription status, splitting the text only once.
+
+        Cached because a list has only a few dozen distinct price texts. Must not
+        log: a cache hit would swallow the message, so callers log instead.
+        """
+        parts = price_text.split()
+        offer = OnlyFansScraper.get_offer(price_text)
+        price = OnlyFansScraper.get_price(price_text, offer, parts)
+        return offer, price, OnlyFansScraper.get_subscription_status(price_text, parts)
 
     @staticmethod
-    def get_price(price_text: str, offer: str) -> str:
+    def get_price(price_text: str, offer: str, parts: Optional[List[str]] = None) -> str:
+        if parts is None:
+            parts = price_text.split()
+
         if offer in ("FREE", "FREE_TRIAL"):
             price = "$0"
         elif offer == "SUBSCRIBED":
             # Extract renewal price for subscribed users (e.g., "renew $15 per month")
-            parts = price_text.split()
             price = None
             for part in parts:
                 if '$' in part:
@@ -403,12 +524,10 @@ class OnlyFansScraper:
                 # Fallback if no price found
                 price = "$0"
         elif offer == "NO_OFFER":
-            parts = price_text.split()
             if len(parts) < 2:
                 raise PriceNotFoundError(f"Unexpected NO_OFFER format: '{price_text}' (expected at least 2 parts)")
             price = parts[1]
         elif offer == "OFFER":
-            parts = price_text.split()
             if len(parts) < 4:
                 raise PriceNotFoundError(f"Unexpected OFFER format: '{price_text}' (expected at least 4 parts)")
             price = parts[-4]
@@ -427,7 +546,7 @@ class OnlyFansScraper:
         elif "FREE FOR" in price_upper:
             return "FREE_TRIAL"
         # Match patterns like "20% off for 30 days" but NOT "FREE for 30 days"
-        elif re.search(r'\b\d+\s*days?\b', price_upper, re.IGNORECASE) and "FREE" not in price_upper:
+        elif DAYS_PATTERN.search(price_upper) and "FREE" not in price_upper:
             return "OFFER"
         elif "FOR FREE" in price_upper:
             return "FREE"
@@ -437,11 +556,15 @@ class OnlyFansScraper:
             raise PriceNotFoundError(f"Unable to determine offer type from: '{price_text}'")
 
     def close_driver(self) -> None:
-        """Close browser and database connections."""
-        self.driver.quit()
-        close_chrome()  # Clean up Chrome process
+        """Release the browser and close the database. Safe to call more than once.
+
+        The WebDriver session and any Chrome we started stay up for reuse by
+        later scrapers in this process and are shut down at interpreter exit.
+        """
+        self.driver = None
         if self.db:
             self.db.close()
+            self.db = None
 
     @staticmethod
     def standardize_price(price_string: str) -> str:
@@ -451,19 +574,19 @@ class OnlyFansScraper:
         return str(parsed_price.amount)
 
     @staticmethod
-    def get_subscription_status(price_element_text) -> str:
-        parts = price_element_text.split()
+    def get_subscription_status(price_element_text, parts: Optional[List[str]] = None) -> str:
+        """Classify the subscription status; STATUS_INVALID is logged by the caller."""
+        if parts is None:
+            parts = price_element_text.split()
         if len(parts) == 0:
-            logging.warning(f"Empty price text when determining subscription status")
-            return "INVALID"
+            return STATUS_INVALID
 
         # Make case-insensitive
         text_upper = price_element_text.upper()
         first_word = parts[0].upper()
         if first_word == "SUBSCRIBE":
-            return "NO_SUBSCRIPTION"
+            return STATUS_NO_SUBSCRIPTION
         elif first_word == "SUBSCRIBED" or first_word == "RENEW" or "SUBSCRIBEDFOR" in text_upper:
-            return "SUBSCRIBED"
+            return STATUS_SUBSCRIBED
         else:
-            logging.warning(f"Unknown subscription status keyword: '{parts[0]}' in text: '{price_element_text}'")
-            return "INVALID"
+            return STATUS_INVALID
@@ -0,0 +1,18 @@
+"""Shared test configuration and fixtures."""
+import pytest
+import sys
+import os
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database import Database
+
+
+@pytest.fixture
+def test_db():
+    """Create a fresh in-memory test database; no file is created or synced."""
+    db = Database(Path(":memory:"))
+    yield db
+    db.close()
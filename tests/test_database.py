@@ -2,21 +2,17 @@
 import pytest
 import sqlite3
 from pathlib import Path
-from datetime import datetime
-import sys
-import os
-
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from datetime import datetime, timedelta
+import threading
+import time
 
 from database import Database
 
 
 @pytest.fixture
-def test_db(tmp_path):
-    """Create temporary test database."""
-    db_path = tmp_path / "test.db"
-    db = Database(db_path)
+def test_db_ondisk(tmp_path):
+    """Create temporary on-disk test database."""
+    db = Database(tmp_path / "test.db")
     yield db
     db.close()
 
@@ -24,10 +20,36 @@ def test_db(tmp_path):
 class TestDatabase:
     """Tests for Database class."""
 
-    def test_database_creation(self, test_db):
+    def test_database_creation(self, test_db_ondisk):
         """Test that database is created successfully."""
-        assert test_db.db_path.exists()
-        assert test_db.db_path.suffix == '.db'
+        assert test_db_ondisk.db_path.exists()
+        assert test_db_ondisk.db_path.suffix == '.db'
+
+    def test_durable_database(self, tmp_path):
+        """Test that durable mode forces synchronous=FULL."""
+        with Database(tmp_path / "durable.db", durable=True) as db:
+            assert db.conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+
+    def test_reopen_upgrades_older_schema(self, test_db_ondisk):
+        """Test that a database stamped with an older schema version re-runs the DDL."""
+        index_sql = "SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'idx_price_history_user_time'"
+        version = test_db_ondisk.conn.execute("PRAGMA user_version").fetchone()[0]
+        test_db_ondisk.conn.execute("DROP INDEX idx_price_history_user_time")
+        test_db_ondisk.conn.execute(f"PRAGMA user_version = {version - 1}")
+        test_db_ondisk.close()
+
+        with Database(test_db_ondisk.db_path) as db:
+            assert db.conn.execute("PRAGMA user_version").fetchone()[0] == version
+            assert db.conn.execute(index_sql).fetchone() is not None
+
+    def test_open_does_not_wait_for_writer(self, test_db_ondisk):
+        """Test that opening an up-to-date database doesn't need the write lock."""
+        test_db_ondisk.conn.execute("BEGIN IMMEDIATE")
+        try:
+            with Database(test_db_ondisk.db_path) as db:
+                assert db.get_latest_scrape_run_id() is None
+        finally:
+            test_db_ondisk.conn.execute("ROLLBACK")
 
     def test_start_scrape_run(self, test_db):
         """Test scrape run creation."""
@@ -68,6 +90,23 @@ class TestDatabase:
         assert history[0]['price'] == 7.99  # Most recent first
         assert history[1]['price'] == 9.99  # Older price
 
+    def test_upsert_user_keeps_first_seen(self, test_db):
+        """Test that updating a user refreshes current state but not first_seen."""
+        run_id = test_db.start_scrape_run("test_list")
+        test_db.upsert_user("testuser", 9.99, "NO_SUBSCRIPTION", [], run_id,
+                            scraped_at=datetime(2024, 1, 1))
+
+        run_id2 = test_db.start_scrape_run("test_list")
+        test_db.upsert_user("testuser", 7.99, "SUBSCRIBED", [], run_id2,
+                            scraped_at=datetime(2024, 2, 1))
+
+        row = test_db.conn.execute("SELECT * FROM users WHERE username = ?", ("testuser",)).fetchone()
+        assert row['current_price'] == 7.99
+        assert row['subscription_status'] == "SUBSCRIBED"
+        assert row['first_seen'] == str(datetime(2024, 1, 1))
+        assert row['last_seen'] == str(datetime(2024, 2, 1))
+        assert row['last_scraped_run_id'] == run_id2
+
     def test_upsert_user_with_free_price(self, test_db):
         """Test handling of free (zero) prices."""
         run_id = test_db.start_scrape_run("test_list")
@@ -84,6 +123,107 @@ class TestDatabase:
         assert len(history) == 1
         assert history[0]['price'] == 0.0
 
+    def test_upsert_users_batch(self, test_db):
+        """Test that upsert_users writes every user and one history row each."""
+        run_id = test_db.start_scrape_run("test_list")
+        test_db.upsert_user("existing", 9.99, "NO_SUBSCRIPTION", ["paid"], run_id)
+
+        run_id2 = test_db.start_scrape_run("test_list")
+        test_db.upsert_users([
+            ("existing", 4.99, "NO_SUBSCRIPTION", ["paid"]),
+            ("newuser", 0.0, "NO_SUBSCRIPTION", ["free"]),
+        ], run_id2)
+
+        history = test_db.get_price_history("existing")
+        assert [h['price'] for h in history] == [4.99, 9.99]
+
+        users = list(test_db.get_users_from_scrape_run(run_id2))
+        assert sorted(u['username'] for u in users) == ["existing", "newuser"]
+        assert {u['username']: u['lists'] for u in users}["newuser"] == ["free"]
+
+    def test_upsert_users_replaces_lists(self, test_db):
+        """Test that a user's lists are replaced by the latest scrape."""
+        run_id = test_db.start_scrape_run("test_list")
+        test_db.upsert_users([
+            ("user1", 5.00, "NO_SUBSCRIPTION", ["a", "b"]),
+            ("user2", 5.00, "NO_SUBSCRIPTION", ["a"]),
+        ], run_id)
+
+        run_id2 = test_db.start_scrape_run("test_list")
+        test_db.upsert_users([
+            ("user1", 5.00, "NO_SUBSCRIPTION", ["b", "c"]),
+            ("user2", 5.00, "NO_SUBSCRIPTION", []),
+        ], run_id2)
+
+        lists = {u['username']: sorted(u['lists']) for u in test_db.get_users_from_scrape_run(run_id2)}
+        assert lists == {"user1": ["b", "c"], "user2": []}
+
+    def test_get_price_changes_window(self, test_db):
+        """Test that only price changes inside the window are reported."""
+        run_id = test_db.start_scrape_run("list")
+        now = datetime.now()
+        test_db.upsert_user("old", 10.00, "NO_SUBSCRIPTION", [], run_id, scraped_at=now - timedelta(days=90))
+        test_db.upsert_user("old", 8.00, "NO_SUBSCRIPTION", [], run_id, scraped_at=now - timedelta(days=60))
+        test_db.upsert_user("recent", 10.00, "NO_SUBSCRIPTION", [], run_id, scraped_at=now - timedelta(days=2))
+        test_db.upsert_user("recent", 5.00, "NO_SUBSCRIPTION", [], run_id, scraped_at=now - timedelta(days=1))
+
+        changes = test_db.get_price_changes(days=30)
+        assert [(c['username'], c['prev_price'], c['price']) for c in changes] == [("recent", 10.00, 5.00)]
+
+    def test_get_run_price_changes(self, test_db):
+        """Test that a run reports only users whose price moved since their last record."""
+        run_id = test_db.start_scrape_run("list")
+        test_db.upsert_users([
+            ("dropped", 10.00, "NO_SUBSCRIPTION", []),
+            ("same", 5.00, "NO_SUBSCRIPTION", []),
+        ], run_id, scraped_at=datetime(2024, 1, 1))
+
+        run_id2 = test_db.start_scrape_run("list")
+        test_db.upsert_users([
+            ("dropped", 7.50, "NO_SUBSCRIPTION", []),
+            ("same", 5.00, "NO_SUBSCRIPTION", []),
+            ("new", 3.00, "NO_SUBSCRIPTION", []),
+        ], run_id2, scraped_at=datetime(2024, 2, 1))
+
+        changes = test_db.get_run_price_changes(run_id2)
+        assert changes == [{'username': "dropped", 'prev_price': 10.00, 'price': 7.50}]
+
+    def test_get_users_with_lists_keeps_commas(self, test_db):
+        """Test that list names containing commas come back intact."""
+        run_id = test_db.start_scrape_run("test_list")
+        test_db.upsert_user("user1", 5.00, "NO_SUBSCRIPTION", ["cheap, cute", "paid"], run_id)
+        test_db.upsert_user("user2", 0.0, "NO_SUBSCRIPTION", [], run_id)
+
+        users = {u['username']: u for u in test_db.get_users_with_lists()}
+        assert sorted(users["user1"]['lists']) == ["cheap, cute", "paid"]
+        assert users["user1"]['current_price'] == 5.00
+        assert users["user2"]['lists'] == []
+
+    def test_upsert_users_large_batch(self, test_db):
+        """Test that a batch spanning several staging chunks is written with its indexes intact."""
+        run_id = test_db.start_scrape_run("test_list")
+        test_db.upsert_users([
+            (f"user{i}", 5.00, "NO_SUBSCRIPTION", [])
+            for i in range(1500)
+        ], run_id)
+
+        assert test_db.get_stats()['price_records'] == 1500
+        indexes = {row['name'] for row in test_db.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'price_history'")}
+        assert {'idx_price_history_user_time', 'idx_price_history_scraped_at', 'idx_price_history_run'} <= indexes
+
+    def test_interrupted_transaction_rolls_back(self, test_db):
+        """Test that a KeyboardInterrupt inside a transaction leaves the connection usable."""
+        with pytest.raises(KeyboardInterrupt):
+            with test_db.transaction() as cursor:
+                cursor.execute("INSERT INTO scrape_runs (list_id, started_at) VALUES ('x', '2024-01-01')")
+                raise KeyboardInterrupt
+
+        assert not test_db.conn.in_transaction
+        run_id = test_db.start_scrape_run("test_list")
+        assert test_db.conn.execute("SELECT COUNT(*) FROM scrape_runs").fetchone()[0] == 1
+        assert run_id > 0
+
     def test_get_latest_scrape_run_id(self, test_db):
         """Test retrieving latest scrape run ID."""
         run_id1 = test_db.start_scrape_run("list1")
@@ -107,6 +247,25 @@ class TestDatabase:
         assert "user2" in usernames
         assert "user3" not in usernames
 
+    def test_get_stats(self, test_db):
+        """Test database statistics counts."""
+        assert test_db.get_stats() == {
+            'total_users': 0,
+            'total_scrapes': 0,
+            'price_records': 0,
+            'last_scrape': None
+        }
+
+        run_id = test_db.start_scrape_run("list")
+        test_db.upsert_user("user", 5.00, "NO_SUBSCRIPTION", [], run_id)
+        test_db.complete_scrape_run(run_id, 1)
+
+        stats = test_db.get_stats()
+        assert stats['total_users'] == 1
+        assert stats['total_scrapes'] == 1
+        assert stats['price_records'] == 1
+        assert stats['last_scrape'] is not None
+
     def test_price_history_ordering(self, test_db):
         """Test that price history is ordered newest first."""
         run_id1 = test_db.start_scrape_run("list")
@@ -133,3 +292,62 @@ class TestDatabase:
 
         history = test_db.get_price_history("user")
         assert history[0]['subscription_status'] == "CUSTOM_STATUS"
+
+    def test_read_transaction(self, test_db):
+        """Test that queries run inside a read snapshot and the snapshot is released."""
+        run_id = test_db.start_scrape_run("list")
+        test_db.upsert_user("user", 5.00, "NO_SUBSCRIPTION", [], run_id)
+
+        with test_db.read_transaction():
+            assert test_db.conn.in_transaction
+            assert test_db.get_stats()['total_users'] == 1
+
+        assert not test_db.conn.in_transaction
+
+    def test_upsert_user_from_another_thread(self, test_db):
+        """Test that the shared connection accepts writes from worker threads."""
+        run_id = test_db.start_scrape_run("list")
+
+        threads = [
+            threading.Thread(target=test_db.upsert_user,
+                             args=(f"user{i}", 5.00, "NO_SUBSCRIPTION", [], run_id))
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert test_db.get_stats()['total_users'] == 4
+
+    def test_read_and_write_transactions_across_threads(self, test_db):
+        """Test that read snapshots and writes on other threads don't collide."""
+        run_id = test_db.start_scrape_run("list")
+        errors = []
+
+        def write(i):
+            try:
+                for j in range(20):
+                    test_db.upsert_user(f"user{i}_{j}", 5.00, "NO_SUBSCRIPTION", [], run_id)
+            except Exception as e:
+                errors.append(e)
+
+        def read():
+            try:
+                for _ in range(20):
+                    with test_db.read_transaction() as cursor:
+                        cursor.execute("SELECT COUNT(*) FROM users").fetchone()
+                        # Let writers run while the snapshot is open
+                        time.sleep(0.001)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(i,)) for i in range(2)]
+        threads += [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert test_db.get_stats()['total_users'] == 40
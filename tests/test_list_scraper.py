@@ -0,0 +1,74 @@
+"""Tests for list_scraper price parsing."""
+import logging
+
+import pytest
+
+from list_scraper import OnlyFansScraper, PriceNotFoundError, UNKNOWN_VALUE
+
+
+@pytest.fixture
+def scraper():
+    """Scraper without a browser or database; parsing needs neither."""
+    return OnlyFansScraper.__new__(OnlyFansScraper)
+
+
+@pytest.fixture(autouse=True)
+def clear_price_cache():
+    """Start each test with an empty price block cache."""
+    OnlyFansScraper._parse_price_block.cache_clear()
+    yield
+    OnlyFansScraper._parse_price_block.cache_clear()
+
+
+class TestParsePriceBlock:
+    """Tests for OnlyFansScraper._parse_price_block."""
+
+    @pytest.mark.parametrize("price_text, expected", [
+        ("SUBSCRIBE $9.99 per month", ("NO_OFFER", "9.99", "NO_SUBSCRIPTION")),
+        ("SUBSCRIBE FOR FREE", ("FREE", "0", "NO_SUBSCRIPTION")),
+        ("SUBSCRIBE Free for 30 days", ("FREE_TRIAL", "0", "NO_SUBSCRIPTION")),
+        ("SUBSCRIBE $4.99 for 30 days", ("OFFER", "4.99", "NO_SUBSCRIPTION")),
+        ("SUBSCRIBED FOR FREE", ("SUBSCRIBED", "0", "SUBSCRIBED")),
+        ("SUBSCRIBEDFOR FREE", ("SUBSCRIBED", "0", "SUBSCRIBED")),
+        ("RENEW $15 per month", ("SUBSCRIBED", "15", "SUBSCRIBED")),
+        ("weird $5 per month", ("NO_OFFER", "5", "INVALID")),
+    ])
+    def test_parses_price_text(self, price_text, expected):
+        """Test offer, price and status for each known price text shape."""
+        assert OnlyFansScraper._parse_price_block(price_text) == expected
+
+    @pytest.mark.parametrize("price_text", ["", "   ", "hello world"])
+    def test_rejects_unparseable_text(self, price_text):
+        """Test that empty or garbage text raises PriceNotFoundError."""
+        with pytest.raises(PriceNotFoundError):
+            OnlyFansScraper._parse_price_block(price_text)
+
+
+class TestScrapeInfo:
+    """Tests for OnlyFansScraper.scrape_info and _parse_row."""
+
+    def test_invalid_status_logged_on_every_call(self, scraper, caplog):
+        """Test that an invalid status is logged again when the parse is a cache hit."""
+        card = {'username': 'someone', 'price_text': 'weird $5 per month', 'lists': []}
+
+        with caplog.at_level(logging.WARNING):
+            first = scraper.scrape_info(card)
+            second = scraper.scrape_info(card)
+
+        assert first == second
+        assert first['subscription_status'] == 'INVALID'
+        assert OnlyFansScraper._parse_price_block.cache_info().hits == 1
+        warnings = [r for r in caplog.records if 'Unknown subscription status' in r.getMessage()]
+        assert len(warnings) == 2
+
+    def test_unparseable_price_becomes_unknown(self, scraper):
+        """Test that garbage price text yields an unknown user with a zero-price row."""
+        info = scraper.scrape_info({'username': 'someone', 'price_text': 'hello world', 'lists': ['a']})
+
+        assert info['price'] == UNKNOWN_VALUE
+        assert OnlyFansScraper._parse_row(info) == ('someone', 0.0, UNKNOWN_VALUE, [])
+
+    def test_parse_row(self):
+        """Test that scraped info converts to an upsert_users row."""
+        user = {'username': 'someone', 'price': '9.99', 'subscription_status': 'NO_SUBSCRIPTION', 'lists': ['paid']}
+        assert OnlyFansScraper._parse_row(user) == ('someone', 9.99, 'NO_SUBSCRIPTION', ['paid'])